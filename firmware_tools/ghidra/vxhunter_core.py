@@ -1,4 +1,5 @@
 # coding=utf-8
+import collections
 import logging
 import re
 import struct
@@ -7,6 +8,20 @@ import time
 
 default_check_count = 100
 
+uint32_little_endian = struct.Struct('<I')
+
+# Symbol name and value address, after 4 bytes of symbol hash link.
+symbol_addrs_big_endian = struct.Struct('>4xII')
+symbol_addrs_little_endian = struct.Struct('<4xII')
+
+non_zero_pattern = re.compile('[^\x00]')
+
+# String terminators followed by next string.
+string_gap_pattern = re.compile('\x00+(?=[^\x00])')
+
+# Unprintable chars and chars which can't be part of function name.
+func_name_bad_chars = ''.join(chr(c) for c in range(0x20) + range(0x7f, 0x100)) + '\\%+,&/)([]'
+
 known_address = [0x80002000, 0x10000, 0x1000, 0xf2003fe4, 0x100000, 0x107fe0]
 
 function_name_key_words = ['bzero', 'usrInit', 'bfill']
@@ -49,7 +64,22 @@ vx_6_sym_types = [
     0x41,  # Global Symbols
 ]
 
-need_create_function = [0x04, 0x05]
+need_create_function = frozenset([0x04, 0x05])
+
+# Last 4 bytes of valid symbols('\x00\x00', symbol type, '\x00') read as little endian uint32.
+vx_5_symbol_tails = frozenset(sym_type << 16 for sym_type in vx_5_sym_types)
+vx_6_symbol_tails = frozenset(sym_type << 16 for sym_type in vx_6_sym_types)
+
+# Symbol table is word aligned in memory, but image may have header with odd length.
+# Aligned offsets are searched first, then every offset.
+symbol_table_alignments = [4, 1]
+
+# Last 4 bytes of symbol: symbol group '\x00\x00', symbol type and '\x00'.
+# Using lookahead to find overlapped symbol tails.
+symbol_tail_patterns = {
+    5: re.compile('(?=\x00\x00[' + ''.join(re.escape(chr(sym_type)) for sym_type in vx_5_sym_types) + ']\x00)'),
+    6: re.compile('(?=\x00\x00[' + ''.join(re.escape(chr(sym_type)) for sym_type in vx_6_sym_types) + ']\x00)'),
+}
 
 
 class VxTarget(object):
@@ -66,6 +96,8 @@ class VxTarget(object):
         self.symbol_table_end = None
         self._string_table = []
         self._symbol_table = []
+        self._string_lengths = []
+        self._symbol_name_lengths = []
         self.symbols = []
         self.load_address = None
         self._firmware = firmware
@@ -200,17 +232,8 @@ class VxTarget(object):
         :return: True if data is symbol, False otherwise.
         """
         if self._vx_version == 5:
-            # Check symbol type is valid
-            sym_type = ord(data[14])
-            if sym_type not in vx_5_sym_types:
-                return False
-
-            # symbol should end with '\x00'
-            if data[15] != '\x00':
-                return False
-
-            # Check symbol group is '\x00\x00'
-            if data[12:14] != '\x00\x00':
+            # Check symbol group is '\x00\x00', symbol type is valid and symbol end with '\x00'
+            if uint32_little_endian.unpack_from(data, 12)[0] not in vx_5_symbol_tails:
                 return False
 
             # symbol_name point should not be zero
@@ -224,17 +247,8 @@ class VxTarget(object):
             return True
 
         elif self._vx_version == 6:
-            # Check symbol type is valid
-            sym_type = ord(data[18])
-            if sym_type not in vx_6_sym_types:
-                return False
-
-            # symbol should end with '\x00'
-            if data[19] != '\x00':
-                return False
-
-            # Check symbol group is '\x00\x00'
-            if data[16:18] != '\x00\x00':
+            # Check symbol group is '\x00\x00', symbol type is valid and symbol end with '\x00'
+            if uint32_little_endian.unpack_from(data, 16)[0] not in vx_6_symbol_tails:
                 return False
 
             # symbol_name point should not be zero
@@ -249,26 +263,42 @@ class VxTarget(object):
 
         return False
 
+    def _find_symbol_table_start(self, alignment):
+        """ Find symbol table start offset by searching symbol tails in image.
+
+        :param alignment: alignment of symbol table start offset.
+        :return: symbol table start offset if found, None otherwise.
+        """
+        if self._vx_version not in symbol_tail_patterns:
+            return None
+
+        for match in symbol_tail_patterns[self._vx_version].finditer(self._firmware):
+            offset = match.start() + 4 - self._symbol_interval
+            if offset < 0 or offset % alignment:
+                continue
+
+            if self._check_symbol_format(offset):
+                return offset
+
+        return None
+
     def find_symbol_table(self):
         """ Find symbol table from image.
 
         :return:
         """
         self.reset_timer()
-        for offset in range(len(self._firmware) - self._symbol_interval):
-            if self.symbol_table_start is None:
-                # Get first data valid the symbol_format
-                if not self._check_symbol_format_simple(self._firmware[offset: offset + self._symbol_interval]):
-                    continue
-
-                elif self._check_symbol_format(offset):
-                    self.logger.info("symbol table start offset: {:010x}".format(offset))
-                    self.symbol_table_start = offset
-                    self._has_symbol = True
-                    self._firmware_info["has_symbol"] = True
-                    break
-            else:
+        offset = None
+        for alignment in symbol_table_alignments:
+            offset = self._find_symbol_table_start(alignment)
+            if offset is not None:
                 break
+        if offset is not None:
+            self.logger.info("symbol table start offset: {:010x}".format(offset))
+            self.symbol_table_start = offset
+            self._has_symbol = True
+            self._firmware_info["has_symbol"] = True
+
         performance_data = "Find symbol table takes {:.3f} seconds".format(self.get_timer())
         self._performance_status.append(performance_data)
         self.logger.debug(performance_data)
@@ -284,7 +314,7 @@ class VxTarget(object):
 
                 if self._check_symbol_format_simple(check_data):
                     self.symbol_table_end = i + self._symbol_interval
-                    self.logger.debug("self.symbol_table_end: {:010x}".format(self.symbol_table_end))
+                    self.logger.debug("self.symbol_table_end: %010x", self.symbol_table_end)
 
                 else:
                     self.logger.info("Symbol table end offset: {:010x}".format(self.symbol_table_end))
@@ -309,19 +339,16 @@ class VxTarget(object):
         else:
             return False
 
+        if self.is_big_endian:
+            unpack_from = symbol_addrs_big_endian.unpack_from
+        else:
+            unpack_from = symbol_addrs_little_endian.unpack_from
+        firmware = self._firmware
+        flag_offset = self._symbol_interval - 2
         for i in range(self.symbol_table_start, self.symbol_table_end, self._symbol_interval):
-            symbol_name_addr = self._firmware[i + 4:i + 8]
-            symbol_dest_addr = self._firmware[i + 8:i + 12]
-            symbol_flag = ord(self._firmware[i + self._symbol_interval - 2])
-            if self.is_big_endian:
-                unpack_format = '>I'
-            else:
-                unpack_format = '<I'
-            symbol_name_addr = int(struct.unpack(unpack_format, symbol_name_addr)[0])
-            symbol_dest_addr = int(struct.unpack(unpack_format, symbol_dest_addr)[0])
-            self.logger.debug("symbol_name_addr: {}; symbol_dest_addr: {}".format(symbol_name_addr, symbol_dest_addr))
-            self._symbol_table.append({'symbol_name_addr': symbol_name_addr, 'symbol_name_length': None, 'symbol_dest_addr': symbol_dest_addr, 'symbol_flag': symbol_flag, 'offset': i})
-        self.logger.debug("len(self._symbol_table): %s".format(len(self._symbol_table)))
+            symbol_name_addr, symbol_dest_addr = unpack_from(firmware, i)
+            symbol_flag = ord(firmware[i + flag_offset])
+            self._symbol_table.append({'symbol_name_addr': int(symbol_name_addr), 'symbol_name_length': None, 'symbol_dest_addr': int(symbol_dest_addr), 'symbol_flag': symbol_flag, 'offset': i})
         self._symbol_table = sorted(self._symbol_table, key=lambda x: x['symbol_name_addr'])
         for i in range(len(self._symbol_table) - 1):
             self._symbol_table[i]['symbol_name_length'] = self._symbol_table[i + 1]['symbol_name_addr'] - \
@@ -330,29 +357,14 @@ class VxTarget(object):
         return True
 
     @staticmethod
-    def _is_printable(c):
-        """ Check Char is printable.
-
-        :param c: char to check.
-        :return: True if char is printable, False otherwise.
-        """
-        if type(c) is int:
-            return 32 <= c <= 126
-        elif type(c) is str:
-            return 32 <= ord(c) <= 126
-
-    def _is_func_name(self, string):
+    def _is_func_name(string):
         """ Check target string is match function name format.
 
         :param string: string to check.
         :return: True if string is match function name format, False otherwise.
         """
-        # function name length should less than 512 byte
-
-        # If any of the data matches a predefined regex of bad characters, or if any character in the string is unprintable, or if its length is over
-        # 512, we must return False.
-
-        return len(string) <= 512 and not re.search(r'.*[\\%\+,&\/\)\(\[\]].*', string) and all(self._is_printable(x) for x in string)
+        # function name length should less than 512 byte, and any unprintable or bad char is deleted by translate.
+        return len(string) <= 512 and len(string.translate(None, func_name_bad_chars)) == len(string)
 
     def _get_prev_string_data(self, offset):
         """ Get previous string from giving offset.
@@ -360,22 +372,19 @@ class VxTarget(object):
         :param offset: offset of image.
         :return: string data, string start offset, string end offset.
         """
-        while offset > 0:
-            if self._firmware[offset].encode('hex') != '00':
-                start_address = offset
-                end_address = offset + 1
-                while offset > 0:
-                    if self._firmware[offset - 1].encode('hex') == '00':
-                        start_address = offset
-                        break
-                    offset -= 1
-                data = self._firmware[start_address:end_address]
-                self.logger.debug("data: {}; start_address: {:010x}; end_address: {:010x}".format(data, start_address, end_address))
-                return data, start_address, end_address
-            else:
-                offset -= 1
-        self.logger.debug("Done looking for previous string data.")
-        return None, None, None
+        # Skip string terminators, they are usually only few bytes between strings.
+        while offset > 0 and self._firmware[offset] == '\x00':
+            offset -= 1
+
+        if offset <= 0:
+            self.logger.debug("Done looking for previous string data.")
+            return None, None, None
+
+        start_address = self._firmware.rfind('\x00', 0, offset) + 1
+        end_address = offset + 1
+        data = self._firmware[start_address:end_address]
+        self.logger.debug("data: %s; start_address: %010x; end_address: %010x", data, start_address, end_address)
+        return data, start_address, end_address
 
     def _get_next_string_data(self, offset):
         """ Get next string from giving offset.
@@ -383,20 +392,16 @@ class VxTarget(object):
         :param offset: offset of image.
         :return: string data, string start offset, string end offset.
         """
-        while offset < len(self._firmware):
-            if self._firmware[offset] != '\x00':
-                start_address = offset
-                end_address = offset
-                while offset <= len(self._firmware):
-                    offset += 1
-                    if self._firmware[offset] == '\x00':
-                        end_address = offset
-                        break
-                data = self._firmware[start_address:end_address]
-                return data, start_address, end_address
-            else:
-                offset += 1
-        return None, None, None
+        match = non_zero_pattern.search(self._firmware, offset)
+        if match is None:
+            return None, None, None
+
+        start_address = match.start()
+        end_address = self._firmware.find('\x00', start_address)
+        if end_address == -1:
+            end_address = len(self._firmware)
+        data = self._firmware[start_address:end_address]
+        return data, start_address, end_address
 
     # TODO: This whole thing might be able to be replaced by just searching for structs
     def find_string_table_by_key_function_index(self, key_offset):
@@ -416,10 +421,10 @@ class VxTarget(object):
         self.logger.debug("Initializing with start_offset = end_offset = {:010x}".format(key_offset))
 
         while start_offset > 0:
-            if self._is_printable(self._firmware[start_offset]) is True:
+            if 32 <= ord(self._firmware[start_offset]) <= 126:
                 # get string from offset
                 string, start_address, end_address = self._get_prev_string_data(start_offset)
-                self.logger.debug("string: {}; start_address: {:010x}; end_address: {:010x}".format(string, start_address, end_address))
+                self.logger.debug("string: %s; start_address: %010x; end_address: %010x", string, start_address, end_address)
                 # check string is function name
                 if self._is_func_name(string) is False:
                     if len(temp_str_tab_data) < count:
@@ -433,7 +438,7 @@ class VxTarget(object):
 
                 # get previous string from offset
                 prev_string, prev_start_address, prev_end_address = self._get_prev_string_data(start_address - 1)
-                self.logger.debug("prev_string: {}, prev_start_address: {:010x}, prev_end_address: {:010x}".format(prev_string, prev_start_address, prev_end_address))
+                self.logger.debug("prev_string: %s, prev_start_address: %010x, prev_end_address: %010x", prev_string, prev_start_address, prev_end_address)
                 if prev_start_address:
                     # strings interval should less than 4
                     if 4 < (start_address - prev_end_address):
@@ -445,7 +450,7 @@ class VxTarget(object):
                             break
                     else:
                         start_offset = start_address - 1
-                        self.logger.debug("start_offset: {}".format(start_offset))
+                        self.logger.debug("start_offset: %s", start_offset)
                 else:
                     break
             else:
@@ -453,7 +458,7 @@ class VxTarget(object):
 
         while end_offset < len(self._firmware):
             # find first printable char
-            if self._is_printable(self._firmware[end_offset]) is True:
+            if 32 <= ord(self._firmware[end_offset]) <= 126:
                 # get string from offset
                 string, start_address, end_address = self._get_next_string_data(end_offset)
                 # check string is function name
@@ -498,25 +503,13 @@ class VxTarget(object):
         :param str_end_address: string table end address.
         :return:
         """
-        self._string_table = []
-        offset = str_start_address
-        address = offset
-        str_tab_data = []
-        while offset <= str_end_address:
-            if self._firmware[offset].encode('hex') == '00':
-                while offset <= str_end_address:
-                    offset += 1
-                    if self._firmware[offset].encode('hex') != '00':
-                        next_address = offset
-                        string = self._firmware[address:next_address]
-                        length = next_address - address
-                        str_tab_data.append({'address': address, 'string': string, 'length': length})
-                        offset = next_address
-                        address = next_address
-                        break
-            else:
-                offset += 1
-        self._string_table = str_tab_data
+        # Every string in table starts after terminators of previous string.
+        string_addrs = [str_start_address]
+        string_addrs.extend(match.end() for match in string_gap_pattern.finditer(self._firmware, str_start_address,
+                                                                                 str_end_address + 2))
+        # Length of string including terminators, last string is dropped since its length is unknown.
+        self._string_table = [{'address': addr, 'length': next_addr - addr} for addr, next_addr in
+                              zip(string_addrs, string_addrs[1:])]
 
     def _check_fix(self, func_index, str_index):
         """
@@ -527,20 +520,30 @@ class VxTarget(object):
         """
         try:
             fault_count = 0
-            self.logger.debug("Symbol table's first element: {}".format(self._symbol_table[0]))
+            self.logger.debug("Symbol table's first element: %s", self._symbol_table[0])
             if len(self._symbol_table) <= default_check_count:
                 count = len(self._symbol_table)
-                self.logger.debug("Length of symbol table, {}, is less than default. Setting iteration count to actual length of table, {}.".format(len(self._symbol_table), count))
+                self.logger.debug("Length of symbol table, %d, is less than default. Setting iteration count to actual length of table, %d.", len(self._symbol_table), count)
             else:
                 count = default_check_count
-                self.logger.debug("Length of symbol table, {}, is greater than default. Setting iteration count to default, {}.".format(len(self._symbol_table), count))
+                self.logger.debug("Length of symbol table, %d, is greater than default. Setting iteration count to default, %d.", len(self._symbol_table), count)
+
+            # Most of the time all lengths are matched, compare them at once.
+            last_index = count - 1
+            if count and func_index + last_index < len(self._symbol_name_lengths) and \
+                    str_index + last_index < len(self._string_lengths) and \
+                    self._symbol_name_lengths[func_index:func_index + last_index] == \
+                    self._string_lengths[str_index:str_index + last_index]:
+                self.logger.debug("_check_fix True")
+                return True
+
             for i in range(count):
 
                 if (func_index >= len(self._symbol_table)) or (str_index >= len(self._string_table)):
                     self.logger.debug("_check_fix False: func_index greater than length of _symbol_table, or str_index greater than length of _string_table.")
                     return False
-                self.logger.debug("str_index: {}; _string_table[str_index]: {}".format(str_index, self._string_table[str_index]))
-                self.logger.debug("func_index: {}; _symbol_table[func_index]: {}".format(func_index, self._symbol_table[func_index]))
+                self.logger.debug("str_index: %s; _string_table[str_index]: %s", str_index, self._string_table[str_index])
+                self.logger.debug("func_index: %s; _symbol_table[func_index]: %s", func_index, self._symbol_table[func_index])
                 if i == count - 1:
                     if fault_count < 10:
                         self.logger.debug("_check_fix True")
@@ -576,12 +579,17 @@ class VxTarget(object):
         if self._has_symbol is False:
             return None
 
+        key_function_index = None
         for key_word in function_name_key_words:
-            prefix_keyword = '\x00_' + key_word + '\x00'
-            key_word = '\x00' + key_word + '\x00'
-            if key_word in self._firmware is False and prefix_keyword in self._firmware is False:
+            key_word_index = self._firmware.find('\x00' + key_word + '\x00')
+            if key_word_index < 0:
+                # Handler _ prefix symbols
+                key_word_index = self._firmware.find('\x00_' + key_word + '\x00')
+            if key_word_index < 0:
                 self.logger.info("Firmware does not contain a function named {}".format(key_word))
                 return None
+            if key_function_index is None:
+                key_function_index = key_word_index
 
         performance_data = "Search function keyword in firmware takes {:.3f} seconds".format(self.get_timer())
         self._performance_status.append(performance_data)
@@ -589,43 +597,36 @@ class VxTarget(object):
 
         # Search function keyword in firmware to locate the function string tables.
         self.reset_timer()
-        try:
-            key_function_index = self._firmware.index('\x00' + function_name_key_words[0] + '\x00')
-            self.logger.debug("key_function_index: {}".format(key_function_index))
-        except Exception as err:
-            # Handler _ prefix symbols
-            self.logger.exception("Exception occurred while loading key_function_index: {}. Continuing...".format(err))
-            key_function_index = self._firmware.index('\x00_' + function_name_key_words[0] + '\x00')
-            self.logger.debug("key_function_index: {}".format(key_function_index))
-
+        self.logger.debug("key_function_index: {}".format(key_function_index))
         str_start_address, str_end_address = self.find_string_table_by_key_function_index(key_function_index)
         self.get_string_table(str_start_address, str_end_address)
         performance_data = "Get function string table takes {:.3f} seconds".format(self.get_timer())
         self._performance_status.append(performance_data)
         self.logger.debug(performance_data)
 
-        # TODO: Need improve performance
         self.reset_timer()
         self.logger.info("Starting loading address analysis")
-        for str_index in range(len(self._string_table)):
-            for func_index in range(len(self._symbol_table)):
-                self.logger.debug("self._string_table[str_index]['length']: {}".format(self._string_table[str_index]['length']))
-                self.logger.debug("self._symbol_table[func_index]['symbol_name_length']: {}".format(self._symbol_table[func_index]['symbol_name_length']))
-                if self._string_table[str_index]['length'] == self._symbol_table[func_index]['symbol_name_length']:
-                    if self._check_fix(func_index, str_index) is True:
-                        self.logger.debug("self._symbol_table[func_index]['symbol_name_addr']: {}".format(self._symbol_table[func_index]['symbol_name_addr']))
-                        self.logger.debug("self._string_table[str_index]['address']: %s" % self._string_table[str_index]['address'])
-                        self.load_address = self._symbol_table[func_index]['symbol_name_addr'] - \
-                                            self._string_table[str_index]['address']
-                        self._firmware_info["load_address"] = self.load_address
-                        self.logger.info('load address is {:010x}'.format(self.load_address))
-                        performance_data = "Analyze loading address takes {:.3f} seconds".format(
-                            self.get_timer())
-                        self._performance_status.append(performance_data)
-                        self.logger.debug(performance_data)
-                        return self.load_address
-                else:
-                    continue
+        self._string_lengths = [string['length'] for string in self._string_table]
+        self._symbol_name_lengths = [symbol['symbol_name_length'] for symbol in self._symbol_table]
+        # Only symbols with the same name length as string need to be checked.
+        symbol_indexes_by_length = collections.defaultdict(list)
+        for func_index, symbol_name_length in enumerate(self._symbol_name_lengths):
+            symbol_indexes_by_length[symbol_name_length].append(func_index)
+
+        for str_index, string_length in enumerate(self._string_lengths):
+            for func_index in symbol_indexes_by_length.get(string_length, ()):
+                if self._check_fix(func_index, str_index) is True:
+                    self.logger.debug("self._symbol_table[func_index]['symbol_name_addr']: %s", self._symbol_table[func_index]['symbol_name_addr'])
+                    self.logger.debug("self._string_table[str_index]['address']: %s", self._string_table[str_index]['address'])
+                    self.load_address = self._symbol_table[func_index]['symbol_name_addr'] - \
+                                        self._string_table[str_index]['address']
+                    self._firmware_info["load_address"] = self.load_address
+                    self.logger.info('load address is {:010x}'.format(self.load_address))
+                    performance_data = "Analyze loading address takes {:.3f} seconds".format(
+                        self.get_timer())
+                    self._performance_status.append(performance_data)
+                    self.logger.debug(performance_data)
+                    return self.load_address
 
         self.logger.error("We didn't find load address in this firmware, sorry!")
         performance_data = "Analyze loading address takes {:.3f} seconds".format(self.get_timer())
@@ -651,9 +652,9 @@ class VxTarget(object):
             if offset <= 0:
                 return False
             # TODO: Need improve, currently use string point to check.
-            string, str_start_address, str_end_address = self._get_next_string_data(offset)
-            if str_start_address != offset:
-                self.logger.info("String {} at offset {} didn't match symbol table.".format(string, offset))
+            # Next string starts at offset only if offset is not a string terminator.
+            if offset >= len(self._firmware) or self._firmware[offset] == '\x00':
+                self.logger.info("String at offset {} didn't match symbol table.".format(offset))
                 return False
         self.logger.info('Load address is {:010x}'.format(address))
         return True
@@ -684,6 +685,8 @@ class VxTarget(object):
         self.symbol_table_end = None
         self._string_table = []
         self._symbol_table = []
+        self._string_lengths = []
+        self._symbol_name_lengths = []
         self.load_address = None
         self._has_symbol = None
 
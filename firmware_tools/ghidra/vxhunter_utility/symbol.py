@@ -12,6 +12,8 @@ from common import demangler, DemangledException
 from common import is_address_in_current_program
 from common import get_logger
 
+from ghidra.app.cmd.disassemble import DisassembleCommand
+from ghidra.program.model.address import AddressSet
 from ghidra.program.model.util import CodeUnitInsertionException
 from ghidra.program.model.symbol import RefType, SourceType
 from vx_structs import *
@@ -25,7 +27,7 @@ logger = get_logger(__name__)
 
 function_name_key_words = ['bzero', 'usrInit', 'bfill']
 
-need_create_function = [0x04, 0x05]
+need_create_function = frozenset([0x04, 0x05])
 
 # Prepare VxWorks symbol types
 
@@ -125,26 +127,29 @@ def demangle_function(demangle_string):
 
     # get parameters
     index = len(demangle_string) - 1
-    if demangle_string[-1] == ')':
-        # have parameters
+    if demangle_string.endswith(')'):
+        # have parameters, jump to each '(' until parentheses are balanced
         parentheses_count = 0
-        while index >= 0:
-            if demangle_string[index] == ')':
-                parentheses_count += 1
-
-            elif demangle_string[index] == '(':
-                parentheses_count -= 1
-
-            index -= 1
+        search_end = len(demangle_string)
+        index = -1
+        while True:
+            open_index = demangle_string.rfind('(', 0, search_end)
+            if open_index < 0:
+                break
 
+            parentheses_count += demangle_string.count(')', open_index, search_end) - 1
+            search_end = open_index
             if parentheses_count == 0:
+                index = open_index - 1
                 break
 
         function_name_end = index
 
     # get function name
     while index >= 0:
-        if demangle_string[index] == ' ':
+        space_index = demangle_string.rfind(' ', 0, index + 1)
+        if space_index >= 0:
+            index = space_index
             temp_data = demangle_string[index + 1:function_name_end + 1]
             if temp_data == "*":
                 function_name_end = index
@@ -158,7 +163,8 @@ def demangle_function(demangle_string):
                 function_name_end = index
                 index -= 1
 
-        elif index == 0:
+        else:
+            index = 0
             if demangle_string[function_name_end] == " ":
                 temp_data = demangle_string[index:function_name_end]
             else:
@@ -167,9 +173,6 @@ def demangle_function(demangle_string):
                 function_name = temp_data
             break
 
-        else:
-            index -= 1
-
     function_name_start = index
     function_parameters = demangle_string[function_name_end + 1:]
 
@@ -236,13 +239,8 @@ def add_symbol(symbol_name, symbol_name_address, symbol_address, symbol_type):
             logger.debug("No data detected at {}. Moving on...".format(symbol_address))
 
 
-        try:
-            symbol_name_string = createAsciiString(symbol_name_address).getValue()
-            logger.debug("Created ascii string {} at {}.".format(symbol_name_string, symbol_name_address))
-        except CodeUnitInsertionException as err:
-            logger.error("Failed to create ascii string for symbol named {} at {}: {}".format(symbol_name, symbol_name_address, err))
-        except BaseException as err:
-            logger.error("Failed to create ascii string for symbol named {} at {}: {}; returning.".format(symbol_name, symbol_name_address, err))
+        symbol_name_string = create_symbol_name(symbol_name, symbol_name_address)
+        if symbol_name_string is None:
             return
 
 
@@ -260,47 +258,186 @@ def add_symbol(symbol_name, symbol_name_address, symbol_address, symbol_type):
         if symbol_name_string and (symbol_type in need_create_function):
             logger.debug("Start disassemble function {} at address {}".format(symbol_name_string, symbol_address.toString()))
             disassemble(symbol_address)
-            function = createFunction(symbol_address, symbol_name_string)
-            if function:
-                function.setName(symbol_name_string, SourceType.USER_DEFINED)
-
-            else:
-                # Add original symbol name
-                createLabel(symbol_address, symbol_name_string, True)
-
-            logger.debug("function: {}; sym_demangled_name: {}".format(function, sym_demangled_name))
-
-            if function and sym_demangled_name:
-                # Add demangled string to comment
-                codeUnit = listing.getCodeUnitAt(symbol_address)
-                codeUnit.setComment(codeUnit.PLATE_COMMENT, sym_demangled_name)
-                # Rename function
-                # TODO: demangle_function can probably be replaced. Function objects in the Ghidra API have each
-                # of .getName(), .getParameters, and .getReturn.
-                function_return, function_name, function_parameters = demangle_function(sym_demangled_name)
-
-                logger.debug("Demangled function name is: {}".format(function_name))
-                logger.debug("Demangled function return is: {}".format(function_return))
-                logger.debug("Demangled function parameters is: {}".format(function_parameters))
-
-                if function_name:
-                    function.setName(function_name, SourceType.USER_DEFINED)
-                    # TODO: Add parameters later
-                # Add original symbol name
-                createLabel(symbol_address, symbol_name_string, True)
-            if function is None and sym_demangled_name is not None:
-                logger.debug('Function for symbol {} was None. In createFunction, one or more functions overlapped the specified address set.'.format(sym_demangled_name))
+            create_symbol_function(symbol_address, symbol_name_string, sym_demangled_name)
 
         else:
-            createLabel(symbol_address, symbol_name_string, True)
-            if sym_demangled_name:
-                codeUnit = listing.getCodeUnitAt(symbol_address)
-                codeUnit.setComment(codeUnit.PLATE_COMMENT, sym_demangled_name)
+            create_symbol_label(symbol_address, symbol_name_string, sym_demangled_name)
 
     except Exception as err:
         logger.error("Create symbol failed: symbol_name: {}, symbol_name_address: {}, symbol_address: {}, symbol_type: {} reason: {}".format(symbol_name_string, symbol_name_address, symbol_address, symbol_type, err))
 
 
+def create_symbol_name(symbol_name, symbol_name_address):
+    """ Create ascii string of symbol name at symbol name address.
+
+    :param symbol_name: symbol name from symbol table.
+    :param symbol_name_address: symbol name address.
+    :return: symbol name string, None if symbol should be skipped.
+    """
+    try:
+        symbol_name_string = createAsciiString(symbol_name_address).getValue()
+        logger.debug("Created ascii string {} at {}.".format(symbol_name_string, symbol_name_address))
+        return symbol_name_string
+    except CodeUnitInsertionException as err:
+        logger.error("Failed to create ascii string for symbol named {} at {}: {}".format(symbol_name, symbol_name_address, err))
+        return symbol_name
+    except BaseException as err:
+        logger.error("Failed to create ascii string for symbol named {} at {}: {}; returning.".format(symbol_name, symbol_name_address, err))
+        return None
+
+
+def create_symbol_label(symbol_address, symbol_name_string, sym_demangled_name):
+    """ Create label of symbol, add demangled symbol name to comment.
+
+    :param symbol_address: symbol address.
+    :param symbol_name_string: symbol name.
+    :param sym_demangled_name: demangled symbol name, None if symbol name isn't mangled.
+    :return:
+    """
+    createLabel(symbol_address, symbol_name_string, True)
+    if sym_demangled_name:
+        codeUnit = listing.getCodeUnitAt(symbol_address)
+        codeUnit.setComment(codeUnit.PLATE_COMMENT, sym_demangled_name)
+
+
+def create_symbol_function(symbol_address, symbol_name_string, sym_demangled_name):
+    """ Create function of symbol at disassembled symbol address.
+
+    :param symbol_address: function address.
+    :param symbol_name_string: symbol name.
+    :param sym_demangled_name: demangled symbol name, None if symbol name isn't mangled.
+    :return:
+    """
+    function = createFunction(symbol_address, symbol_name_string)
+    if function:
+        function.setName(symbol_name_string, SourceType.USER_DEFINED)
+
+    else:
+        # Add original symbol name
+        createLabel(symbol_address, symbol_name_string, True)
+
+    logger.debug("function: {}; sym_demangled_name: {}".format(function, sym_demangled_name))
+
+    if function and sym_demangled_name:
+        # Add demangled string to comment
+        codeUnit = listing.getCodeUnitAt(symbol_address)
+        codeUnit.setComment(codeUnit.PLATE_COMMENT, sym_demangled_name)
+        # Rename function
+        # TODO: demangle_function can probably be replaced. Function objects in the Ghidra API have each
+        # of .getName(), .getParameters, and .getReturn.
+        function_return, function_name, function_parameters = demangle_function(sym_demangled_name)
+
+        logger.debug("Demangled function name is: {}".format(function_name))
+        logger.debug("Demangled function return is: {}".format(function_return))
+        logger.debug("Demangled function parameters is: {}".format(function_parameters))
+
+        if function_name:
+            function.setName(function_name, SourceType.USER_DEFINED)
+            # TODO: Add parameters later
+        # Add original symbol name
+        createLabel(symbol_address, symbol_name_string, True)
+    if function is None and sym_demangled_name is not None:
+        logger.debug('Function for symbol {} was None. In createFunction, one or more functions overlapped the specified address set.'.format(sym_demangled_name))
+
+
+def remove_data(data_address):
+    """ Remove data at address, log error instead of raising.
+
+    :param data_address: address of data.
+    :return:
+    """
+    try:
+        if getDataAt(data_address):
+            removeDataAt(data_address)
+
+    except (Exception, java.lang.Exception) as err:
+        logger.error("Failed to remove data at {}: {}".format(data_address, err))
+
+
+def add_symbols(symbols):
+    """ Add symbols from VxTarget.get_symbols to current program.
+
+    Symbol names and labels are created first, then all functions are disassembled in one command before creating
+    them, instead of clearing, disassembling and creating each symbol one by one.
+    Not used by firmware init yet, add_symbol is still the default until this is checked against it in Ghidra.
+
+    :param symbols: list of symbol dict with symbol_name, symbol_name_addr, symbol_dest_addr and symbol_flag.
+    :return:
+    """
+    # Clear old data at every symbol name at once.
+    try:
+        name_addresses = AddressSet()
+        for symbol in symbols:
+            if symbol["symbol_name_addr"]:
+                name_start = symbol["symbol_name_addr"]
+                name_end = name_start + max(len(symbol["symbol_name"]), 1) - 1
+                name_addresses.add(toAddr(name_start), toAddr(name_end))
+        clearListing(name_addresses)
+
+    except (Exception, java.lang.Exception) as err:
+        logger.error("Failed to clear symbol names: {}; removing data of each name.".format(err))
+        for symbol in symbols:
+            if symbol["symbol_name_addr"]:
+                remove_data(toAddr(symbol["symbol_name_addr"]))
+
+    function_addresses = AddressSet()
+    function_symbols = []
+    for symbol in symbols:
+        symbol_name_string = symbol["symbol_name"]
+        symbol_name_address = symbol["symbol_name_addr"]
+        symbol_address = symbol["symbol_dest_addr"]
+        symbol_type = symbol["symbol_flag"]
+        try:
+            symbol_address = toAddr(symbol_address)
+            if symbol_name_address:
+                symbol_name_address = toAddr(symbol_name_address)
+                symbol_name_string = create_symbol_name(symbol_name_string, symbol_name_address)
+                if symbol_name_string is None:
+                    continue
+
+            sym_demangled_name = demangled_symbol(symbol_name_string)
+            if symbol_name_string and (symbol_type in need_create_function):
+                function_addresses.add(symbol_address)
+                function_symbols.append((symbol_address, symbol_name_string, sym_demangled_name))
+                continue
+
+            if getInstructionAt(symbol_address):
+                removeInstructionAt(symbol_address)
+            create_symbol_label(symbol_address, symbol_name_string, sym_demangled_name)
+
+        except (Exception, java.lang.Exception) as err:
+            logger.error("Create symbol failed: symbol_name: {}, symbol_name_address: {}, symbol_address: {}, symbol_type: {} reason: {}".format(symbol_name_string, symbol_name_address, symbol_address, symbol_type, err))
+
+    if not function_symbols:
+        return
+
+    # Drop old code at function addresses, then disassemble all functions in one pass.
+    logger.debug("Start disassemble {} functions".format(len(function_symbols)))
+    try:
+        clearListing(function_addresses)
+        disassemble_command = DisassembleCommand(function_addresses, None, True)
+        if not disassemble_command.applyTo(currentProgram, monitor):
+            raise Exception(disassemble_command.getStatusMsg())
+
+    except (Exception, java.lang.Exception) as err:
+        logger.error("Failed to disassemble functions: {}; disassembling each function.".format(err))
+        for symbol_address, symbol_name_string, sym_demangled_name in function_symbols:
+            try:
+                if getInstructionAt(symbol_address):
+                    removeInstructionAt(symbol_address)
+                disassemble(symbol_address)
+
+            except (Exception, java.lang.Exception) as err:
+                logger.error("Failed to disassemble function {} at {}: {}".format(symbol_name_string, symbol_address, err))
+
+    for symbol_address, symbol_name_string, sym_demangled_name in function_symbols:
+        try:
+            create_symbol_function(symbol_address, symbol_name_string, sym_demangled_name)
+
+        except (Exception, java.lang.Exception) as err:
+            logger.error("Create function failed: symbol_name: {}, symbol_address: {}, reason: {}".format(symbol_name_string, symbol_address, err))
+
+
 def fix_symbol_table_structs(symbol_table_start, symbol_table_end, vx_version):
     symbol_interval = 16
     dt = vx_5_symtbl_dt
@@ -356,21 +493,22 @@ def fix_symbol_by_chains(head, tail, vx_version):
     if vx_version == 6:
         symbol_interval = 20
         dt = vx_6_symtbl_dt
+    type_offset = symbol_interval - 2
     ea = head
     while True:
-        prev_symbol_addr = toAddr(getInt(ea))
+        prev_symbol = getInt(ea)
         symbol_name_address = getInt(ea.add(0x04))
         symbol_dest_address = getInt(ea.add(0x08))
-        symbol_type = getByte(ea.add(symbol_interval - 2))
+        symbol_type = getByte(ea.add(type_offset))
         create_struct(ea, dt)
         # Using symbol_address as default symbol_name.
         symbol_name = "0x{:08X}".format(symbol_dest_address)
         add_symbol(symbol_name, symbol_name_address, symbol_dest_address, symbol_type)
 
-        if getInt(ea) == 0 or ea == tail:
+        if prev_symbol == 0 or ea == tail:
             break
 
-        ea = prev_symbol_addr
+        ea = toAddr(prev_symbol)
 
     return
 
@@ -1,10 +1,31 @@
 # coding=utf-8
+import collections
 import logging
+import re
 import struct
 import time
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 default_check_count = 100
 
+uint32_little_endian = struct.Struct('<I')
+
+# Symbol name and value address, after 4 bytes of symbol hash link.
+symbol_addrs_big_endian = struct.Struct('>4xII')
+symbol_addrs_little_endian = struct.Struct('<4xII')
+
+non_zero_pattern = re.compile(b'[^\x00]')
+
+# String terminators followed by next string.
+string_gap_pattern = re.compile(b'\x00+(?=[^\x00])')
+
+# Unprintable chars and chars which can't be part of function name.
+func_name_bad_chars = bytes(range(0x20)) + bytes(range(0x7f, 0x100)) + b'\\%+,&/)([]'
+
 known_address = [0x80002000, 0x10000, 0x1000, 0xf2003fe4, 0x100000, 0x107fe0]
 
 function_name_key_words = [b'bzero', b'usrInit', b'bfill']
@@ -47,7 +68,45 @@ vx_6_sym_types = [
     0x41,  # Global Symbols
 ]
 
-need_create_function = [0x04, 0x05]
+need_create_function = frozenset([0x04, 0x05])
+
+# Last 4 bytes of valid symbols('\x00\x00', symbol type, '\x00') read as little endian uint32.
+vx_5_symbol_tails = frozenset(sym_type << 16 for sym_type in vx_5_sym_types)
+vx_6_symbol_tails = frozenset(sym_type << 16 for sym_type in vx_6_sym_types)
+
+# Symbol table is word aligned in memory, but image may have header with odd length.
+# Aligned offsets are searched first, then every offset.
+symbol_table_alignments = [4, 1]
+
+# Last 4 bytes of symbol: symbol group '\x00\x00', symbol type and '\x00'.
+# Using lookahead to find overlapped symbol tails.
+symbol_tail_patterns = {
+    5: re.compile(b'(?=\x00\x00[' + b''.join(re.escape(bytes([sym_type])) for sym_type in vx_5_sym_types) + b']\x00)'),
+    6: re.compile(b'(?=\x00\x00[' + b''.join(re.escape(bytes([sym_type])) for sym_type in vx_6_sym_types) + b']\x00)'),
+}
+
+
+def to_list(data):
+    """ Convert numpy array or list to list of python objects.
+
+    :param data: numpy array or list.
+    :return: list of data.
+    """
+    if np is not None and isinstance(data, np.ndarray):
+        return data.tolist()
+    return list(data)
+
+
+def is_same_items(data1, data2):
+    """ Check two numpy arrays or lists have same items.
+
+    :param data1: numpy array or list.
+    :param data2: numpy array or list.
+    :return: True if data1 and data2 have same items, False otherwise.
+    """
+    if np is not None and isinstance(data1, np.ndarray):
+        return np.array_equal(data1, data2)
+    return data1 == data2
 
 
 class VxTarget(object):
@@ -62,11 +121,24 @@ class VxTarget(object):
         self._vx_version = vx_version
         self.symbol_table_start = None
         self.symbol_table_end = None
-        self._string_table = []
-        self._symbol_table = []
+        # String table, item i of every list is from same string.
+        self._string_addrs = []
+        self._string_lengths = []
+        # Symbol table sorted by symbol name address, item i of every list is from same symbol.
+        # Lists are numpy arrays if numpy is available.
+        self._symbol_name_addrs = []
+        self._symbol_name_lengths = []
+        self._symbol_dest_addrs = []
+        self._symbol_flags = []
+        self._symbol_offsets = []
         self.symbols = []
         self.load_address = None
         self._firmware = firmware
+        # Slicing memoryview won't copy data.
+        self._fw_mv = memoryview(firmware)
+        self._fw_np = None
+        if np is not None:
+            self._fw_np = np.frombuffer(firmware, dtype=np.uint8)
         self._has_symbol = None
         if self._vx_version == 5:
             self._symbol_interval = 16
@@ -127,9 +199,9 @@ class VxTarget(object):
 
         :return:
         """
-        data1 = self._firmware[self.symbol_table_start + 4:self.symbol_table_start + 4 + self._symbol_interval]
-        data2 = self._firmware[self.symbol_table_start + 4 + self._symbol_interval:self.symbol_table_start +
-                                                                                   4 + self._symbol_interval * 2]
+        data1 = self._fw_mv[self.symbol_table_start + 4:self.symbol_table_start + 4 + self._symbol_interval]
+        data2 = self._fw_mv[self.symbol_table_start + 4 + self._symbol_interval:self.symbol_table_start +
+                                                                                4 + self._symbol_interval * 2]
         if data1[0:2] == data2[0:2]:
             self.logger.info("VxWorks endian: Big endian.")
             self.is_big_endian = True
@@ -151,7 +223,7 @@ class VxTarget(object):
         if end_offset > len(self._firmware):
             return False
 
-        check_data = self._firmware[start_offset:end_offset]
+        check_data = self._fw_mv[start_offset:end_offset]
         is_big_endian = True
         is_little_endian = True
         # check symbol data match struct
@@ -166,23 +238,31 @@ class VxTarget(object):
 
         if self._vx_version == 5:
             self.logger.debug("Check VxWorks 5 symbol format")
-            # check is big endian
-            for i in range(9):
-                check_data_1 = check_data[4 + i * self._symbol_interval:6 + i * self._symbol_interval]
-                data2 = check_data[4 + (i + 1) * self._symbol_interval:6 + (i + 1) * self._symbol_interval]
-                if check_data_1 != data2:
-                    self.logger.debug("VxWorks binary is not big endian.")
-                    is_big_endian = False
-                    break
+            if self._fw_np is not None:
+                # Name pointer of first 10 symbols, high half word for big endian and low half word for little endian.
+                symbols = self._fw_np[start_offset:start_offset + self._symbol_interval * 10].reshape(10, self._symbol_interval)
+                is_big_endian = bool(np.all(symbols[:-1, 4:6] == symbols[1:, 4:6]))
+                is_little_endian = bool(np.all(symbols[:-1, 6:8] == symbols[1:, 6:8]))
+                self.logger.debug("VxWorks binary is big endian: {}, is little endian: {}.".format(is_big_endian, is_little_endian))
 
-            # check is little endian
-            for i in range(9):
-                check_data_1 = check_data[6 + i * self._symbol_interval:8 + i * self._symbol_interval]
-                data2 = check_data[6 + (i + 1) * self._symbol_interval:8 + (i + 1) * self._symbol_interval]
-                if check_data_1 != data2:
-                    self.logger.debug("VxWorks binary is not little endian.")
-                    is_little_endian = False
-                    break
+            else:
+                # check is big endian
+                for i in range(9):
+                    check_data_1 = check_data[4 + i * self._symbol_interval:6 + i * self._symbol_interval]
+                    data2 = check_data[4 + (i + 1) * self._symbol_interval:6 + (i + 1) * self._symbol_interval]
+                    if check_data_1 != data2:
+                        self.logger.debug("VxWorks binary is not big endian.")
+                        is_big_endian = False
+                        break
+
+                # check is little endian
+                for i in range(9):
+                    check_data_1 = check_data[6 + i * self._symbol_interval:8 + i * self._symbol_interval]
+                    data2 = check_data[6 + (i + 1) * self._symbol_interval:8 + (i + 1) * self._symbol_interval]
+                    if check_data_1 != data2:
+                        self.logger.debug("VxWorks binary is not little endian.")
+                        is_little_endian = False
+                        break
 
             if is_big_endian and is_little_endian:
                 return False
@@ -198,17 +278,8 @@ class VxTarget(object):
         :return: True if data is symbol, False otherwise.
         """
         if self._vx_version == 5:
-            # Check symbol type is valid
-            sym_type = data[14]
-            if sym_type not in vx_5_sym_types:
-                return False
-
-            # symbol should end with '\x00'
-            if data[15] != 0:
-                return False
-
-            # Check symbol group is '\x00\x00'
-            if data[12:14] != b'\x00\x00':
+            # Check symbol group is '\x00\x00', symbol type is valid and symbol end with '\x00'
+            if uint32_little_endian.unpack_from(data, 12)[0] not in vx_5_symbol_tails:
                 return False
 
             # symbol_name point should not be zero
@@ -222,17 +293,8 @@ class VxTarget(object):
             return True
 
         elif self._vx_version == 6:
-            # Check symbol type is valid
-            sym_type = data[18]
-            if sym_type not in vx_6_sym_types:
-                return False
-
-            # symbol should end with '\x00'
-            if data[19] != 0:
-                return False
-
-            # Check symbol group is '\x00\x00'
-            if data[16:18] != b'\x00\x00':
+            # Check symbol group is '\x00\x00', symbol type is valid and symbol end with '\x00'
+            if uint32_little_endian.unpack_from(data, 16)[0] not in vx_6_symbol_tails:
                 return False
 
             # symbol_name point should not be zero
@@ -247,42 +309,137 @@ class VxTarget(object):
 
         return False
 
+    def _find_symbol_table_start(self, alignment):
+        """ Find symbol table start offset by searching symbol tails in image.
+
+        :param alignment: alignment of symbol table start offset.
+        :return: symbol table start offset if found, None otherwise.
+        """
+        if self._vx_version not in symbol_tail_patterns:
+            return None
+
+        for match in symbol_tail_patterns[self._vx_version].finditer(self._firmware):
+            offset = match.start() + 4 - self._symbol_interval
+            if offset < 0 or offset % alignment:
+                continue
+
+            if self._check_symbol_format(offset):
+                return offset
+
+        return None
+
+    def _get_symbol_format_mask(self):
+        """ Vectorized version of _check_symbol_format_simple over every offset of image.
+
+        :return: numpy bool array, mask[offset] is True if symbol at offset is valid.
+        """
+        fw = self._fw_np
+        count = len(fw) - self._symbol_interval + 1
+        if count <= 0:
+            return np.zeros(0, dtype=bool)
+
+        def field(index):
+            return fw[index:index + count]
+
+        if self._vx_version == 5:
+            sym_types = vx_5_sym_types
+        elif self._vx_version == 6:
+            sym_types = vx_6_sym_types
+        else:
+            return np.zeros(count, dtype=bool)
+
+        # symbol type is the byte before last byte of symbol
+        type_index = self._symbol_interval - 2
+
+        # Check symbol type is valid
+        valid_types = np.zeros(256, dtype=bool)
+        valid_types[sym_types] = True
+        mask = valid_types[field(type_index)]
+        # symbol should end with '\x00' and symbol group should be '\x00\x00'
+        mask &= (field(type_index + 1) | field(type_index - 1) | field(type_index - 2)) == 0
+        # symbol_name point should not be zero
+        mask &= (field(4) | field(5) | field(6) | field(7)) != 0
+        if self._vx_version == 5:
+            # symbol value point should not be zero
+            mask &= (field(8) | field(9) | field(10) | field(11)) != 0
+
+        return mask
+
+    def _find_symbol_table_start_np(self, mask, alignment):
+        """ Find first offset which have default_check_count valid symbols in a row.
+
+        :param mask: symbol format mask from _get_symbol_format_mask.
+        :param alignment: alignment of symbol table start offset.
+        :return: symbol table start offset if found, None otherwise.
+        """
+        candidates = []
+        for remainder in range(0, self._symbol_interval, alignment):
+            symbols = mask[remainder::self._symbol_interval]
+            if len(symbols) < default_check_count:
+                continue
+            # Count valid symbols in every window of default_check_count symbols.
+            valid_count = np.concatenate(([0], np.cumsum(symbols, dtype=np.int64)))
+            windows = (valid_count[default_check_count:] - valid_count[:-default_check_count]) == default_check_count
+            candidates.append(np.flatnonzero(windows) * self._symbol_interval + remainder)
+
+        if not candidates:
+            return None
+
+        for offset in np.sort(np.concatenate(candidates)).tolist():
+            if self._check_symbol_format(offset):
+                return offset
+
+        return None
+
     def find_symbol_table(self):
         """ Find symbol table from image.
 
         :return:
         """
         self.reset_timer()
-        for offset in range(len(self._firmware) - self._symbol_interval):
-            if self.symbol_table_start is None:
-                # Get first data valid the symbol_format
-                if not self._check_symbol_format_simple(self._firmware[offset: offset + self._symbol_interval]):
-                    continue
-
-                elif self._check_symbol_format(offset):
-                    self.logger.info("symbol table start offset: {:010x}".format(offset))
-                    self.symbol_table_start = offset
-                    self._has_symbol = True
-                    self._firmware_info["has_symbol"] = True
-                    break
+        mask = None
+        if self._fw_np is not None:
+            mask = self._get_symbol_format_mask()
+
+        offset = None
+        for alignment in symbol_table_alignments:
+            if mask is not None:
+                offset = self._find_symbol_table_start_np(mask, alignment)
             else:
+                offset = self._find_symbol_table_start(alignment)
+            if offset is not None:
                 break
+
+        if offset is not None:
+            self.logger.info("symbol table start offset: {:010x}".format(offset))
+            self.symbol_table_start = offset
+            self._has_symbol = True
+            self._firmware_info["has_symbol"] = True
+
         performance_data = "Find symbol table takes {:.3f} seconds".format(self.get_timer())
         self._performance_status.append(performance_data)
         self.logger.debug(performance_data)
 
-        if self.symbol_table_start:
+        if self.symbol_table_start and mask is not None:
+            self.reset_timer()
+            symbols = mask[self.symbol_table_start::self._symbol_interval]
+            invalid = np.flatnonzero(~symbols)
+            symbol_count = int(invalid[0]) if len(invalid) else len(symbols)
+            self.symbol_table_end = self.symbol_table_start + symbol_count * self._symbol_interval
+            self.logger.info("Symbol table end offset: {:010x}".format(self.symbol_table_end))
+
+        elif self.symbol_table_start:
             self.reset_timer()
             for i in range(self.symbol_table_start, len(self._firmware), self._symbol_interval):
-                check_data = self._firmware[i:i + self._symbol_interval]
+                check_data = self._fw_mv[i:i + self._symbol_interval]
 
                 if len(check_data) < self._symbol_interval:
-                    self.logger.debug("check_data length is too small: {}".format(check_data))
+                    self.logger.debug("check_data length is too small: %d", len(check_data))
                     break
 
                 if self._check_symbol_format_simple(check_data):
                     self.symbol_table_end = i + self._symbol_interval
-                    self.logger.debug("self.symbol_table_end: {:010x}".format(self.symbol_table_end))
+                    self.logger.debug("self.symbol_table_end: %010x", self.symbol_table_end)
 
                 else:
                     self.logger.info("Symbol table end offset: {:010x}".format(self.symbol_table_end))
@@ -307,58 +464,63 @@ class VxTarget(object):
         else:
             return False
 
-        for i in range(self.symbol_table_start, self.symbol_table_end, self._symbol_interval):
-            symbol_name_addr = self._firmware[i + 4:i + 8]
-            symbol_dest_addr = self._firmware[i + 8:i + 12]
-            symbol_flag = self._firmware[i + self._symbol_interval - 2]
-            if self.is_big_endian:
-                unpack_format = '>I'
-            else:
-                unpack_format = '<I'
-            symbol_name_addr = int(struct.unpack(unpack_format, symbol_name_addr)[0])
-            symbol_dest_addr = int(struct.unpack(unpack_format, symbol_dest_addr)[0])
-            self.logger.debug("symbol_name_addr: {}; symbol_dest_addr: {}".format(symbol_name_addr, symbol_dest_addr))
-            self._symbol_table.append({'symbol_name_addr': symbol_name_addr, 'symbol_name_length': None, 'symbol_dest_addr': symbol_dest_addr, 'symbol_flag': symbol_flag, 'offset': i})
-        self.logger.debug("len(self._symbol_table): %s".format(len(self._symbol_table)))
-        self._symbol_table = sorted(self._symbol_table, key=lambda x: x['symbol_name_addr'])
-        for i in range(len(self._symbol_table) - 1):
-            self._symbol_table[i]['symbol_name_length'] = self._symbol_table[i + 1]['symbol_name_addr'] - \
-                                                          self._symbol_table[i]['symbol_name_addr']
-        self.logger.debug("len(self._symbol_table): {}".format(len(self._symbol_table)))
+        if self._fw_np is not None:
+            return self._get_symbol_table_np()
+
+        if self.is_big_endian:
+            unpack_from = symbol_addrs_big_endian.unpack_from
+        else:
+            unpack_from = symbol_addrs_little_endian.unpack_from
+        firmware = self._firmware
+        flag_offset = self._symbol_interval - 2
+        # Item of symbol_table is (symbol_name_addr, symbol_dest_addr, symbol_flag, offset).
+        symbol_table = [unpack_from(firmware, i) + (firmware[i + flag_offset], i) for i in
+                        range(self.symbol_table_start, self.symbol_table_end, self._symbol_interval)]
+        self.logger.debug("len(symbol_table): {}".format(len(symbol_table)))
+        symbol_table = sorted(symbol_table, key=lambda x: x[0])
+        self._symbol_name_addrs = [symbol[0] for symbol in symbol_table]
+        self._symbol_dest_addrs = [symbol[1] for symbol in symbol_table]
+        self._symbol_flags = [symbol[2] for symbol in symbol_table]
+        self._symbol_offsets = [symbol[3] for symbol in symbol_table]
+        # Last symbol name length is unknown.
+        self._symbol_name_lengths = [next_addr - addr for addr, next_addr in
+                                     zip(self._symbol_name_addrs, self._symbol_name_addrs[1:])] + [-1]
         return True
 
-    @staticmethod
-    def _is_printable(c):
-        """ Check Char is printable.
+    def _get_symbol_table_np(self):
+        """ Parse whole symbol table at once with numpy.
 
-        :param c: char to check.
-        :return: True if char is printable, False otherwise.
+        :return: True if get symbol table data successful, False otherwise.
         """
-        if type(c) is int:
-            return 32 <= c <= 126
-        elif type(c) is str:
-            return 32 <= ord(c) <= 126
+        symbols = self._fw_np[self.symbol_table_start:self.symbol_table_end].reshape(-1, self._symbol_interval)
+        if self.is_big_endian:
+            unpack_format = '>u4'
+        else:
+            unpack_format = '<u4'
+        symbol_name_addrs = np.ascontiguousarray(symbols[:, 4:8]).view(unpack_format).ravel()
+        symbol_dest_addrs = np.ascontiguousarray(symbols[:, 8:12]).view(unpack_format).ravel()
+        symbol_flags = symbols[:, self._symbol_interval - 2]
+        offsets = np.arange(self.symbol_table_start, self.symbol_table_end, self._symbol_interval)
+
+        order = np.argsort(symbol_name_addrs, kind='stable')
+        self._symbol_name_addrs = symbol_name_addrs[order].astype(np.int64)
+        self._symbol_dest_addrs = symbol_dest_addrs[order].astype(np.int64)
+        self._symbol_flags = symbol_flags[order]
+        self._symbol_offsets = offsets[order]
+        # Last symbol name length is unknown.
+        self._symbol_name_lengths = np.append(np.diff(self._symbol_name_addrs), -1)
+        self.logger.debug("len(self._symbol_name_addrs): {}".format(len(self._symbol_name_addrs)))
+        return True
 
-    def _is_func_name(self, string):
+    @staticmethod
+    def _is_func_name(string):
         """ Check target string is match function name format.
 
         :param string: string to check.
         :return: True if string is match function name format, False otherwise.
         """
-        #
-        bad_str = [b'\\', b'%', b'+', b',', b'&', b'/', b')', b'(', b'[', b']']
-        # function name length should less than 512 byte
-        if len(string) > 512:
-            return False
-
-        for data in bad_str:
-            if data in string:
-                return False
-
-        for c in string:
-            if self._is_printable(c) is False:
-                return False
-        return True
+        # function name length should less than 512 byte, and any unprintable or bad char is deleted by translate.
+        return len(string) <= 512 and len(string.translate(None, func_name_bad_chars)) == len(string)
 
     def _get_prev_string_data(self, offset):
         """ Get previous string from giving offset.
@@ -366,22 +528,19 @@ class VxTarget(object):
         :param offset: offset of image.
         :return: string data, string start offset, string end offset.
         """
-        while offset > 0:
-            if self._firmware[offset] != 0:
-                start_address = offset
-                end_address = offset + 1
-                while offset > 0:
-                    if self._firmware[offset - 1] == 0:
-                        start_address = offset
-                        break
-                    offset -= 1
-                data = self._firmware[start_address:end_address]
-                self.logger.debug("data: {}; start_address: {:010x}; end_address: {:010x}".format(data, start_address, end_address))
-                return data, start_address, end_address
-            else:
-                offset -= 1
-        self.logger.debug("Done looking for previous string data.")
-        return None, None, None
+        # Skip string terminators, they are usually only few bytes between strings.
+        while offset > 0 and self._firmware[offset] == 0:
+            offset -= 1
+
+        if offset <= 0:
+            self.logger.debug("Done looking for previous string data.")
+            return None, None, None
+
+        start_address = self._firmware.rfind(b'\x00', 0, offset) + 1
+        end_address = offset + 1
+        data = self._firmware[start_address:end_address]
+        self.logger.debug("data: %s; start_address: %010x; end_address: %010x", data, start_address, end_address)
+        return data, start_address, end_address
 
     def _get_next_string_data(self, offset):
         """ Get next string from giving offset.
@@ -389,20 +548,16 @@ class VxTarget(object):
         :param offset: offset of image.
         :return: string data, string start offset, string end offset.
         """
-        while offset < len(self._firmware):
-            if self._firmware[offset] != 0:
-                start_address = offset
-                end_address = offset
-                while offset <= len(self._firmware):
-                    offset += 1
-                    if self._firmware[offset] == 0:
-                        end_address = offset
-                        break
-                data = self._firmware[start_address:end_address]
-                return data, start_address, end_address
-            else:
-                offset += 1
-        return None, None, None
+        match = non_zero_pattern.search(self._firmware, offset)
+        if match is None:
+            return None, None, None
+
+        start_address = match.start()
+        end_address = self._firmware.find(b'\x00', start_address)
+        if end_address == -1:
+            end_address = len(self._firmware)
+        data = self._firmware[start_address:end_address]
+        return data, start_address, end_address
 
     def find_string_table_by_key_function_index(self, key_offset):
         """ Find string table by VxWorks key function name offset in VxWorks image.
@@ -412,19 +567,19 @@ class VxTarget(object):
         """
         self.logger.debug("Attempting to find string table by key function index with offset {:010x}".format(key_offset))
         temp_str_tab_data = []
-        if len(self._symbol_table) > default_check_count:
+        if len(self._symbol_name_addrs) > default_check_count:
             count = default_check_count
         else:
-            count = len(self._symbol_table)
+            count = len(self._symbol_name_addrs)
         start_offset = key_offset
         end_offset = key_offset
         self.logger.debug("Initializing with start_offset = end_offset = {:010x}".format(key_offset))
 
         while start_offset > 0:
-            if self._is_printable(self._firmware[start_offset]) is True:
+            if 32 <= self._firmware[start_offset] <= 126:
                 # get string from offset
                 string, start_address, end_address = self._get_prev_string_data(start_offset)
-                self.logger.debug("string: {}; start_address: {:010x}; end_address: {:010x}".format(string, start_address, end_address))
+                self.logger.debug("string: %s; start_address: %010x; end_address: %010x", string, start_address, end_address)
                 # check string is function name
                 if self._is_func_name(string) is False:
                     if len(temp_str_tab_data) < count:
@@ -438,7 +593,7 @@ class VxTarget(object):
 
                 # get previous string from offset
                 prev_string, prev_start_address, prev_end_address = self._get_prev_string_data(start_address - 1)
-                self.logger.debug("prev_string: {}, prev_start_address: {:010x}, prev_end_address: {:010x}".format(prev_string, prev_start_address, prev_end_address))
+                self.logger.debug("prev_string: %s, prev_start_address: %010x, prev_end_address: %010x", prev_string, prev_start_address, prev_end_address)
                 if prev_start_address:
                     # strings interval should less than 4
                     if 4 < (start_address - prev_end_address):
@@ -450,7 +605,7 @@ class VxTarget(object):
                             break
                     else:
                         start_offset = start_address - 1
-                        self.logger.debug("start_offset: {}".format(start_offset))
+                        self.logger.debug("start_offset: %s", start_offset)
                 else:
                     break
             else:
@@ -458,7 +613,7 @@ class VxTarget(object):
 
         while end_offset < len(self._firmware):
             # find first printable char
-            if self._is_printable(self._firmware[end_offset]) is True:
+            if 32 <= self._firmware[end_offset] <= 126:
                 # get string from offset
                 string, start_address, end_address = self._get_next_string_data(end_offset)
                 # check string is function name
@@ -503,25 +658,19 @@ class VxTarget(object):
         :param str_end_address: string table end address.
         :return:
         """
-        self._string_table = []
-        offset = str_start_address
-        address = offset
-        str_tab_data = []
-        while offset <= str_end_address:
-            if self._firmware[offset] == 0:
-                while offset <= str_end_address:
-                    offset += 1
-                    if self._firmware[offset] != 0:
-                        next_address = offset
-                        string = self._firmware[address:next_address]
-                        length = next_address - address
-                        str_tab_data.append({'address': address, 'string': string, 'length': length})
-                        offset = next_address
-                        address = next_address
-                        break
-            else:
-                offset += 1
-        self._string_table = str_tab_data
+        # Every string in table starts after terminators of previous string.
+        string_addrs = [str_start_address]
+        string_addrs.extend(match.end() for match in string_gap_pattern.finditer(self._firmware, str_start_address,
+                                                                                 str_end_address + 2))
+        # Length of string including terminators, last string is dropped since its length is unknown.
+        string_lengths = [next_addr - addr for addr, next_addr in zip(string_addrs, string_addrs[1:])]
+        string_addrs = string_addrs[:-1]
+        if self._fw_np is not None:
+            self._string_addrs = np.array(string_addrs, dtype=np.int64)
+            self._string_lengths = np.array(string_lengths, dtype=np.int64)
+        else:
+            self._string_addrs = string_addrs
+            self._string_lengths = string_lengths
 
     def _check_fix(self, func_index, str_index):
         """
@@ -532,20 +681,30 @@ class VxTarget(object):
         """
         try:
             fault_count = 0
-            self.logger.debug("Symbol table's first element: {}".format(self._symbol_table[0]))
-            if len(self._symbol_table) <= default_check_count:
-                count = len(self._symbol_table)
-                self.logger.debug("Length of symbol table, {}, is less than default. Setting iteration count to actual length of table, {}.".format(len(self._symbol_table), count))
+            self.logger.debug("Symbol table's first symbol name address: %s", self._symbol_name_addrs[0])
+            if len(self._symbol_name_addrs) <= default_check_count:
+                count = len(self._symbol_name_addrs)
+                self.logger.debug("Length of symbol table, %d, is less than default. Setting iteration count to actual length of table, %d.", len(self._symbol_name_addrs), count)
             else:
                 count = default_check_count
-                self.logger.debug("Length of symbol table, {}, is greater than default. Setting iteration count to default, {}.".format(len(self._symbol_table), count))
+                self.logger.debug("Length of symbol table, %d, is greater than default. Setting iteration count to default, %d.", len(self._symbol_name_addrs), count)
+
+            # Most of the time all lengths are matched, compare them at once.
+            last_index = count - 1
+            if count and func_index + last_index < len(self._symbol_name_lengths) and \
+                    str_index + last_index < len(self._string_lengths) and \
+                    is_same_items(self._symbol_name_lengths[func_index:func_index + last_index],
+                                  self._string_lengths[str_index:str_index + last_index]):
+                self.logger.debug("_check_fix True")
+                return True
+
             for i in range(count):
 
-                if (func_index >= len(self._symbol_table)) or (str_index >= len(self._string_table)):
-                    self.logger.debug("_check_fix False: func_index greater than length of _symbol_table, or str_index greater than length of _string_table.")
+                if (func_index >= len(self._symbol_name_lengths)) or (str_index >= len(self._string_lengths)):
+                    self.logger.debug("_check_fix False: func_index greater than length of symbol table, or str_index greater than length of string table.")
                     return False
-                self.logger.debug("str_index: {}; _string_table[str_index]: {}".format(str_index, self._string_table[str_index]))
-                self.logger.debug("func_index: {}; _symbol_table[func_index]: {}".format(func_index, self._symbol_table[func_index]))
+                self.logger.debug("str_index: %s; string_addr: %s; string_length: %s", str_index, self._string_addrs[str_index], self._string_lengths[str_index])
+                self.logger.debug("func_index: %s; symbol_name_addr: %s; symbol_name_length: %s", func_index, self._symbol_name_addrs[func_index], self._symbol_name_lengths[func_index])
                 if i == count - 1:
                     if fault_count < 10:
                         self.logger.debug("_check_fix True")
@@ -554,12 +713,12 @@ class VxTarget(object):
                         self.logger.debug("_check_fix False: Too many faults.")
                         return False
 
-                if self._string_table[str_index]['length'] == self._symbol_table[func_index]['symbol_name_length']:
+                if self._string_lengths[str_index] == self._symbol_name_lengths[func_index]:
                     func_index += 1
                     str_index += 1
                     self.logger.debug("_check_fix continue")
 
-                elif self._symbol_table[func_index]['symbol_name_length'] < self._string_table[str_index]['length']:
+                elif self._symbol_name_lengths[func_index] < self._string_lengths[str_index]:
                     # Sometime Symbol name might point to mid of string.
                     fault_count += 1
                     func_index += 1
@@ -581,12 +740,17 @@ class VxTarget(object):
         if self._has_symbol is False:
             return None
 
+        key_function_index = None
         for key_word in function_name_key_words:
-            prefix_keyword = b'\x00_' + key_word + b'\x00'
-            key_word = b'\x00' + key_word + b'\x00'
-            if key_word in self._firmware is False and prefix_keyword in self._firmware is False:
+            key_word_index = self._firmware.find(b'\x00' + key_word + b'\x00')
+            if key_word_index < 0:
+                # Handler _ prefix symbols
+                key_word_index = self._firmware.find(b'\x00_' + key_word + b'\x00')
+            if key_word_index < 0:
                 self.logger.info("Firmware does not contain a function named {}".format(key_word))
                 return None
+            if key_function_index is None:
+                key_function_index = key_word_index
 
         performance_data = "Search function keyword in firmware takes {:.3f} seconds".format(self.get_timer())
         self._performance_status.append(performance_data)
@@ -594,43 +758,34 @@ class VxTarget(object):
 
         # Search function keyword in firmware to locate the function string tables.
         self.reset_timer()
-        try:
-            key_function_index = self._firmware.index(b'\x00' + function_name_key_words[0] + b'\x00')
-            self.logger.debug("key_function_index: {}".format(key_function_index))
-        except Exception as err:
-            # Handler _ prefix symbols
-            self.logger.debug("Exception occurred while loading key_function_index: {}. Continuing...".format(err))
-            key_function_index = self._firmware.index(b'\x00_' + function_name_key_words[0] + b'\x00')
-            self.logger.debug("key_function_index: {}".format(key_function_index))
-
+        self.logger.debug("key_function_index: {}".format(key_function_index))
         str_start_address, str_end_address = self.find_string_table_by_key_function_index(key_function_index)
         self.get_string_table(str_start_address, str_end_address)
         performance_data = "Get function string table takes {:.3f} seconds".format(self.get_timer())
         self._performance_status.append(performance_data)
         self.logger.debug(performance_data)
 
-        # TODO: Need improve performance
         self.reset_timer()
         self.logger.info("Starting loading address analysis")
-        for str_index in range(len(self._string_table)):
-            for func_index in range(len(self._symbol_table)):
-                self.logger.debug("self._string_table[str_index]['length']: {}".format(self._string_table[str_index]['length']))
-                self.logger.debug("self._symbol_table[func_index]['symbol_name_length']: {}".format(self._symbol_table[func_index]['symbol_name_length']))
-                if self._string_table[str_index]['length'] == self._symbol_table[func_index]['symbol_name_length']:
-                    if self._check_fix(func_index, str_index) is True:
-                        self.logger.debug("self._symbol_table[func_index]['symbol_name_addr']: {}".format(self._symbol_table[func_index]['symbol_name_addr']))
-                        self.logger.debug("self._string_table[str_index]['address']: %s" % self._string_table[str_index]['address'])
-                        self.load_address = self._symbol_table[func_index]['symbol_name_addr'] - \
-                                            self._string_table[str_index]['address']
-                        self._firmware_info["load_address"] = self.load_address
-                        self.logger.info('load address is {:010x}'.format(self.load_address))
-                        performance_data = "Analyze loading address takes {:.3f} seconds".format(
-                            self.get_timer())
-                        self._performance_status.append(performance_data)
-                        self.logger.debug(performance_data)
-                        return self.load_address
-                else:
-                    continue
+        # Only symbols with the same name length as string need to be checked.
+        symbol_indexes_by_length = collections.defaultdict(list)
+        for func_index, symbol_name_length in enumerate(to_list(self._symbol_name_lengths)):
+            symbol_indexes_by_length[symbol_name_length].append(func_index)
+
+        for str_index, string_length in enumerate(to_list(self._string_lengths)):
+            for func_index in symbol_indexes_by_length.get(string_length, ()):
+                if self._check_fix(func_index, str_index) is True:
+                    self.logger.debug("self._symbol_name_addrs[func_index]: %s", self._symbol_name_addrs[func_index])
+                    self.logger.debug("self._string_addrs[str_index]: %s", self._string_addrs[str_index])
+                    self.load_address = int(self._symbol_name_addrs[func_index]) - \
+                                        int(self._string_addrs[str_index])
+                    self._firmware_info["load_address"] = self.load_address
+                    self.logger.info('load address is {:010x}'.format(self.load_address))
+                    performance_data = "Analyze loading address takes {:.3f} seconds".format(
+                        self.get_timer())
+                    self._performance_status.append(performance_data)
+                    self.logger.debug(performance_data)
+                    return self.load_address
 
         self.logger.error("We didn't find load address in this firmware, sorry!")
         performance_data = "Analyze loading address takes {:.3f} seconds".format(self.get_timer())
@@ -645,20 +800,34 @@ class VxTarget(object):
         """
         if not self._has_symbol:
             return False
-        if len(self._symbol_table) > default_check_count:
+        if len(self._symbol_name_addrs) > default_check_count:
             self.logger.debug("Length of symbol table greater than default. Setting iteration count to default of {}.".format(default_check_count))
             count = default_check_count
         else:
-            count = len(self._symbol_table)
+            count = len(self._symbol_name_addrs)
         self.logger.debug("symbol_table length is {}".format(count))
-        for i in range(count):
-            offset = self._symbol_table[i]['symbol_name_addr'] - address
+        if self._fw_np is not None:
+            offsets = self._symbol_name_addrs[:count] - address
+            # Only gather bytes in firmware, offsets out of range already failed.
+            in_range = (offsets > 0) & (offsets < len(self._fw_np))
+            matched = in_range.copy()
+            matched[in_range] = self._fw_np[offsets[in_range]] != 0
+            if not matched.all():
+                offset = offsets[np.argmin(matched)]
+                if offset > 0:
+                    self.logger.info("String at offset {} didn't match symbol table.".format(offset))
+                return False
+            self.logger.info('Load address is {:010x}'.format(address))
+            return True
+
+        for symbol_name_addr in to_list(self._symbol_name_addrs[:count]):
+            offset = symbol_name_addr - address
             if offset <= 0:
                 return False
             # TODO: Need improve, currently use string point to check.
-            string, str_start_address, str_end_address = self._get_next_string_data(offset)
-            if str_start_address != offset:
-                self.logger.info("String {} at offset {} didn't match symbol table.".format(string, offset))
+            # Next string starts at offset only if offset is not a string terminator.
+            if offset >= len(self._firmware) or self._firmware[offset] == 0:
+                self.logger.info("String at offset {} didn't match symbol table.".format(offset))
                 return False
         self.logger.info('Load address is {:010x}'.format(address))
         return True
@@ -687,8 +856,13 @@ class VxTarget(object):
         self.is_big_endian = False
         self.symbol_table_start = None
         self.symbol_table_end = None
-        self._string_table = []
-        self._symbol_table = []
+        self._string_addrs = []
+        self._string_lengths = []
+        self._symbol_name_addrs = []
+        self._symbol_name_lengths = []
+        self._symbol_dest_addrs = []
+        self._symbol_flags = []
+        self._symbol_offsets = []
         self.load_address = None
         self._has_symbol = None
 
@@ -707,10 +881,9 @@ class VxTarget(object):
     def get_symbols(self):
         self.symbols = []
         if self.load_address:
-            for symbol in self._symbol_table:
-                symbol_name_addr = symbol["symbol_name_addr"]
-                symbol_dest_addr = symbol["symbol_dest_addr"]
-                symbol_flag = symbol["symbol_flag"]
+            for symbol_name_addr, symbol_dest_addr, symbol_flag in zip(to_list(self._symbol_name_addrs),
+                                                                       to_list(self._symbol_dest_addrs),
+                                                                       to_list(self._symbol_flags)):
                 symbol_name_firmware_addr = symbol_name_addr - self.load_address
                 symbol_name = self.get_string_from_firmware_by_offset(symbol_name_firmware_addr)
                 self.symbols.append({
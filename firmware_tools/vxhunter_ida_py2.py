@@ -50,7 +50,7 @@ vx_6_sym_types = [
     0x41,  # Global Symbols
 ]
 
-need_create_function = [0x04, 0x05]
+need_create_function = frozenset([0x04, 0x05])
 
 
 class VxTarget(object):
@@ -362,11 +362,11 @@ class VxTarget(object):
         :return: string data, string start offset, string end offset.
         """
         while offset > 0:
-            if self._firmware[offset].encode('hex') != '00':
+            if self._firmware[offset] != '\x00':
                 start_address = offset
                 end_address = offset + 1
                 while offset > 0:
-                    if self._firmware[offset - 1].encode('hex') == '00':
+                    if self._firmware[offset - 1] == '\x00':
                         start_address = offset
                         break
                     offset -= 1
@@ -504,10 +504,10 @@ class VxTarget(object):
         address = offset
         str_tab_data = []
         while offset <= str_end_address:
-            if self._firmware[offset].encode('hex') == '00':
+            if self._firmware[offset] == '\x00':
                 while offset <= str_end_address:
                     offset += 1
-                    if self._firmware[offset].encode('hex') != '00':
+                    if self._firmware[offset] != '\x00':
                         next_address = offset
                         string = self._firmware[address:next_address]
                         length = next_address - address
@@ -577,12 +577,17 @@ class VxTarget(object):
         if self._has_symbol is False:
             return None
 
+        key_function_index = None
         for key_word in function_name_key_words:
-            prefix_keyword = '\x00_' + key_word + '\x00'
-            key_word = '\x00' + key_word + '\x00'
-            if key_word in self._firmware is False and prefix_keyword in self._firmware is False:
+            key_word_index = self._firmware.find('\x00' + key_word + '\x00')
+            if key_word_index < 0:
+                # Handler _ prefix symbols
+                key_word_index = self._firmware.find('\x00_' + key_word + '\x00')
+            if key_word_index < 0:
                 self.logger.info("Firmware does not contain a function named {}".format(key_word))
                 return None
+            if key_function_index is None:
+                key_function_index = key_word_index
 
         performance_data = "Search function keyword in firmware takes {:.3f} seconds".format(self.get_timer())
         self._performance_status.append(performance_data)
@@ -590,15 +595,7 @@ class VxTarget(object):
 
         # Search function keyword in firmware to locate the function string tables.
         self.reset_timer()
-        try:
-            key_function_index = self._firmware.index('\x00' + function_name_key_words[0] + '\x00')
-            self.logger.debug("key_function_index: {}".format(key_function_index))
-        except Exception as err:
-            # Handler _ prefix symbols
-            self.logger.exception("Exception occurred while loading key_function_index: {}. Continuing...".format(err))
-            key_function_index = self._firmware.index('\x00_' + function_name_key_words[0] + '\x00')
-            self.logger.debug("key_function_index: {}".format(key_function_index))
-
+        self.logger.debug("key_function_index: {}".format(key_function_index))
         str_start_address, str_end_address = self.find_string_table_by_key_function_index(key_function_index)
         self.get_string_table(str_start_address, str_end_address)
         performance_data = "Get function string table takes {:.3f} seconds".format(self.get_timer())
@@ -974,24 +971,24 @@ class VxHunter_Plugin_t(idaapi.plugin_t):
             idaapi.rebase_program(0x70000000, 0x0008)
             shift_address -= 0x70000000
         idaapi.rebase_program(shift_address, 0x0008)
+        # Symbol type is the byte before last byte of symbol.
+        type_offset = symbol_interval - 2
         while ea < symbol_table_end:
             # for VxWorks 6 unknown symbol format
             if idc.Byte(ea + symbol_table_end - 2) == 3:
                 ea += symbol_interval
                 continue
             offset = 4
+            sName_addr = idc.Dword(ea + offset)
             if idaapi.IDA_SDK_VERSION >= 700:
-                idc.create_strlit(idc.Dword(ea + offset), idc.BADADDR)
+                idc.create_strlit(sName_addr, idc.BADADDR)
             else:
-                idc.MakeStr(idc.Dword(ea + offset), idc.BADADDR)
-            sName = idc.GetString(idc.Dword(ea + offset), -1, idc.ASCSTR_C)
+                idc.MakeStr(sName_addr, idc.BADADDR)
+            sName = idc.GetString(sName_addr, -1, idc.ASCSTR_C)
             print("Found %s in symbol table" % sName)
             if sName:
                 sName_dst = idc.Dword(ea + offset + 4)
-                if vx_version == 6:
-                    sName_type = idc.Byte(ea + 0x12)
-                else:
-                    sName_type = idc.Byte(ea + 0x0e)
+                sName_type = idc.Byte(ea + type_offset)
                 idc.MakeName(sName_dst, sName)
                 if sName_type in need_create_function:
                     # flags = idc.GetFlags(ea)
@@ -54,7 +54,7 @@ vx_6_sym_types = [
     0x41,  # Global Symbols
 ]
 
-need_create_function = [0x04, 0x05]
+need_create_function = frozenset([0x04, 0x05])
 
 
 class VxTarget(object):
@@ -588,12 +588,17 @@ class VxTarget(object):
         if self._has_symbol is False:
             return None
 
+        key_function_index = None
         for key_word in function_name_key_words:
-            prefix_keyword = b'\x00_' + key_word + b'\x00'
-            key_word = b'\x00' + key_word + b'\x00'
-            if key_word in self._firmware is False and prefix_keyword in self._firmware is False:
+            key_word_index = self._firmware.find(b'\x00' + key_word + b'\x00')
+            if key_word_index < 0:
+                # Handler _ prefix symbols
+                key_word_index = self._firmware.find(b'\x00_' + key_word + b'\x00')
+            if key_word_index < 0:
                 self.logger.info("Firmware does not contain a function named {}".format(key_word))
                 return None
+            if key_function_index is None:
+                key_function_index = key_word_index
 
         performance_data = "Search function keyword in firmware takes {:.3f} seconds".format(self.get_timer())
         self._performance_status.append(performance_data)
@@ -601,15 +606,7 @@ class VxTarget(object):
 
         # Search function keyword in firmware to locate the function string tables.
         self.reset_timer()
-        try:
-            key_function_index = self._firmware.index(b'\x00' + function_name_key_words[0] + b'\x00')
-            self.logger.debug("key_function_index: {}".format(key_function_index))
-        except Exception as err:
-            # Handler _ prefix symbols
-            self.logger.debug("Exception occurred while loading key_function_index: {}. Continuing...".format(err))
-            key_function_index = self._firmware.index(b'\x00_' + function_name_key_words[0] + b'\x00')
-            self.logger.debug("key_function_index: {}".format(key_function_index))
-
+        self.logger.debug("key_function_index: {}".format(key_function_index))
         str_start_address, str_end_address = self.find_string_table_by_key_function_index(key_function_index)
         self.get_string_table(str_start_address, str_end_address)
         performance_data = "Get function string table takes {:.3f} seconds".format(self.get_timer())
@@ -985,21 +982,21 @@ class VxHunter_Plugin_t(idaapi.plugin_t):
             idaapi.rebase_program(0x70000000, 0x0008)
             shift_address -= 0x70000000
         idaapi.rebase_program(shift_address, 0x0008)
+        # Symbol type is the byte before last byte of symbol.
+        type_offset = symbol_interval - 2
         while ea < symbol_table_end:
             # for VxWorks 6 unknown symbol format
             if idc.get_wide_byte(ea + symbol_table_end - 2) == 3:
                 ea += symbol_interval
                 continue
             offset = 4
-            idc.create_strlit(idc.get_wide_dword(ea + offset), idc.BADADDR)
-            sName = idc.get_strlit_contents(idc.get_wide_dword(ea + offset), -1, ida_nalt.STRTYPE_C)
+            sName_addr = idc.get_wide_dword(ea + offset)
+            idc.create_strlit(sName_addr, idc.BADADDR)
+            sName = idc.get_strlit_contents(sName_addr, -1, ida_nalt.STRTYPE_C)
             print("Found %s in symbol table" % sName)
             if sName:
                 sName_dst = idc.get_wide_dword(ea + offset + 4)
-                if vx_version == 6:
-                    sName_type = idc.get_wide_byte(ea + 0x12)
-                else:
-                    sName_type = idc.get_wide_byte(ea + 0x0e)
+                sName_type = idc.get_wide_byte(ea + type_offset)
 
                 idc.set_name(sName_dst, sName.decode('utf-8'), idc.SN_CHECK)
                 if sName_type in need_create_function:
@@ -0,0 +1,124 @@
+from common import BaseTestCase, mock
+import struct
+import sys
+import unittest
+
+has_numpy = False
+if sys.version_info[0] >= 3:
+    from firmware_tools import vxhunter_core_py3
+    from firmware_tools.vxhunter_core_py3 import VxTarget
+    has_numpy = vxhunter_core_py3.np is not None
+
+
+load_address = 0x10000
+filler = b'\xaa'
+
+
+def build_firmware(vx_version=5, is_big_endian=False, table_offset=0x40, symbol_count=150,
+                   key_words=(b'bzero', b'usrInit', b'bfill')):
+    """ Build VxWorks image with symbol table at table_offset followed by string table of symbol names.
+
+    :return: image data, symbol table start offset, symbol table end offset.
+    """
+    endian = '>' if is_big_endian else '<'
+    # String table is searched around key function names, so put them after enough function names.
+    names = [('func_%03d' % i).encode() for i in range(symbol_count - len(key_words))] + list(key_words)
+    symbol_interval = 16 if vx_version == 5 else 20
+    table_end = table_offset + symbol_interval * symbol_count
+    # Gap of zeros between symbol table and string table.
+    string_table_offset = table_end + 0x20
+
+    string_table = b''
+    symbols = b''
+    for i, name in enumerate(names):
+        name_addr = load_address + string_table_offset + len(string_table)
+        string_table += name + b'\x00'
+        dest_addr = 0x200000 + i * 0x10
+        # Function symbols and data symbols.
+        symbol_type = 0x05 if i % 2 else (0x07 if vx_version == 5 else 0x09)
+        symbols += struct.pack(endian + 'III', 0x300000 + i * symbol_interval, name_addr, dest_addr)
+        if vx_version == 6:
+            symbols += b'\x00' * 4
+        symbols += b'\x00\x00' + struct.pack('B', symbol_type) + b'\x00'
+
+    firmware = filler * table_offset + symbols + b'\x00' * 0x20 + string_table + b'\x00' * 0x10 + filler * 0x40
+    return firmware, table_offset, table_end
+
+
+@unittest.skipIf(sys.version_info[0] < 3, "vxhunter_core_py3 needs Python 3")
+class VxHunterCorePy3Tests(BaseTestCase):
+    def setUp(self):
+        super(VxHunterCorePy3Tests, self).setUp()
+
+    def get_targets(self, firmware, vx_version):
+        """ Get targets analyzed by every symbol table scanner backend. """
+        targets = {}
+        if has_numpy:
+            targets['numpy'] = VxTarget(firmware=firmware, vx_version=vx_version, logger=self.logger)
+        with mock.patch.object(vxhunter_core_py3, 'np', None):
+            targets['python'] = VxTarget(firmware=firmware, vx_version=vx_version, logger=self.logger)
+        return targets
+
+    def check_symbol_table(self, firmware, vx_version, table_start, table_end):
+        for backend, target in self.get_targets(firmware, vx_version).items():
+            self.assertEqual(table_start, target.symbol_table_start, backend)
+            self.assertEqual(table_end, target.symbol_table_end, backend)
+
+    def test_find_symbol_table_vx5(self):
+        firmware, table_start, table_end = build_firmware(vx_version=5)
+        self.check_symbol_table(firmware, 5, table_start, table_end)
+
+    def test_find_symbol_table_vx6(self):
+        firmware, table_start, table_end = build_firmware(vx_version=6, is_big_endian=True)
+        self.check_symbol_table(firmware, 6, table_start, table_end)
+
+    def test_find_unaligned_symbol_table(self):
+        for vx_version in (5, 6):
+            firmware, table_start, table_end = build_firmware(vx_version=vx_version, table_offset=6)
+            self.check_symbol_table(firmware, vx_version, table_start, table_end)
+            for backend, target in self.get_targets(firmware, vx_version).items():
+                self.assertEqual(load_address, target.find_loading_address(), backend)
+
+    def test_find_symbol_table_all_formats(self):
+        for vx_version in (5, 6):
+            for is_big_endian in (False, True):
+                for table_offset in (0x40, 0x41, 6):
+                    firmware, table_start, table_end = build_firmware(vx_version=vx_version,
+                                                                      is_big_endian=is_big_endian,
+                                                                      table_offset=table_offset)
+                    self.check_symbol_table(firmware, vx_version, table_start, table_end)
+                    for backend, target in self.get_targets(firmware, vx_version).items():
+                        self.assertEqual(is_big_endian, target.is_big_endian, backend)
+
+    def test_find_symbol_table_too_short(self):
+        for vx_version in (5, 6):
+            # Less than default_check_count symbols.
+            firmware = build_firmware(vx_version=vx_version, symbol_count=50)[0]
+            self.check_symbol_table(firmware, vx_version, None, None)
+            # Less than one symbol.
+            self.check_symbol_table(filler * 8, vx_version, None, None)
+
+    @unittest.skipIf(not has_numpy, "numpy is not installed")
+    def test_symbol_format_mask(self):
+        for vx_version in (5, 6):
+            firmware = build_firmware(vx_version=vx_version, table_offset=6)[0]
+            target = VxTarget(firmware=firmware, vx_version=vx_version, logger=self.logger)
+            mask = target._get_symbol_format_mask()
+            for offset in range(len(mask)):
+                data = firmware[offset:offset + target._symbol_interval]
+                self.assertEqual(target._check_symbol_format_simple(data), mask[offset], offset)
+
+    def test_find_loading_address_without_key_word(self):
+        firmware = build_firmware(key_words=(b'bzero', b'usrInit', b'bfill_x'))[0]
+        for backend, target in self.get_targets(firmware, 5).items():
+            with mock.patch.object(target, 'find_string_table_by_key_function_index') as find_string_table:
+                self.assertIsNone(target.find_loading_address(), backend)
+                find_string_table.assert_not_called()
+
+    def test_find_loading_address_with_prefix_key_word(self):
+        firmware = build_firmware(key_words=(b'_bzero', b'usrInit', b'_bfill'))[0]
+        for backend, target in self.get_targets(firmware, 5).items():
+            with mock.patch.object(target, 'find_string_table_by_key_function_index',
+                                   wraps=target.find_string_table_by_key_function_index) as find_string_table:
+                self.assertEqual(load_address, target.find_loading_address(), backend)
+                find_string_table.assert_called_once_with(firmware.find(b'\x00_bzero\x00'))
@@ -99,26 +99,29 @@ def demangle_function(demangle_string):
 
     # get parameters
     index = len(demangle_string) - 1
-    if demangle_string[-1] == ')':
-        # have parameters
+    if demangle_string.endswith(')'):
+        # have parameters, jump to each '(' until parentheses are balanced
         parentheses_count = 0
-        while index >= 0:
-            if demangle_string[index] == ')':
-                parentheses_count += 1
-
-            elif demangle_string[index] == '(':
-                parentheses_count -= 1
-
-            index -= 1
+        search_end = len(demangle_string)
+        index = -1
+        while True:
+            open_index = demangle_string.rfind('(', 0, search_end)
+            if open_index < 0:
+                break
 
+            parentheses_count += demangle_string.count(')', open_index, search_end) - 1
+            search_end = open_index
             if parentheses_count == 0:
+                index = open_index - 1
                 break
 
         function_name_end = index
 
     # get function name
     while index >= 0:
-        if demangle_string[index] == ' ':
+        space_index = demangle_string.rfind(' ', 0, index + 1)
+        if space_index >= 0:
+            index = space_index
             temp_data = demangle_string[index + 1:function_name_end + 1]
             if temp_data == "*":
                 function_name_end = index
@@ -132,7 +135,8 @@ def demangle_function(demangle_string):
                 function_name_end = index
                 index -= 1
 
-        elif index == 0:
+        else:
+            index = 0
             if demangle_string[function_name_end] == " ":
                 temp_data = demangle_string[index:function_name_end]
             else:
@@ -141,9 +145,6 @@ def demangle_function(demangle_string):
                 function_name = temp_data
             break
 
-        else:
-            index -= 1
-
     function_name_start = index
     function_parameters = demangle_string[function_name_end + 1:]
 